@@ -18,6 +18,7 @@ from ...navigation.recorded_track import (
     RecordedWaypoint,
 )
 from ...navigation.track_recording_controller import TrackRecordingController
+from ...navigation.track_simplification import simplify_track
 from .confirm_dialog import ConfirmDialog as confirm_dialog
 
 log = logging.getLogger('feldfreund_devkit.track_recorder')
@@ -313,7 +314,7 @@ class TrackRecorderDialog:
     def _build_status_bar(self) -> None:
         with ui.row().classes('w-full items-center gap-3 px-1'):
             ui.input(value=self.recorded_track.name) \
-                .on_value_change(lambda e: setattr(self.recorded_track, 'name', e.value)) \
+                .on_value_change(lambda e: self._rename(e.value)) \
                 .props('dense outlined') \
                 .classes('w-64') \
                 .tooltip('Track name')
@@ -353,6 +354,9 @@ class TrackRecorderDialog:
                 .tooltip('Delete this track.')
             self._recording_action_row = ui.row().classes('items-center gap-3 flex-grow')
             with self._recording_action_row:
+                ui.switch('Auto', on_change=lambda e: self.controller.set_automatic(e.value)) \
+                    .bind_value_from(self.controller, 'is_automatic') \
+                    .tooltip('Add waypoints automatically while driving')
                 ui.space()
                 self._undo_button = ui.button('Undo last', icon='undo', on_click=self._undo_last) \
                     .props('flat') \
@@ -368,6 +372,9 @@ class TrackRecorderDialog:
             self._view_action_row = ui.row().classes('items-center gap-3 flex-grow')
             with self._view_action_row:
                 ui.space()
+                ui.button('Simplify', icon='timeline', on_click=self._simplify_track) \
+                    .props('flat') \
+                    .tooltip('Merge waypoints that lie on a common spline into longer segments')
                 ui.button('Start Recording', icon='fiber_manual_record', on_click=self._start_recording)
 
     def _tick(self) -> None:
@@ -441,7 +448,11 @@ class TrackRecorderDialog:
         self._update_status()
 
     def _on_gnss_requirement_changed(self, e) -> None:
-        self.recorded_track.gnss_requirement = e.value
+        self.recorded_track.set_gnss_requirement(e.value)
+        self.provider.notify_track_modified()
+
+    def _rename(self, name: str) -> None:
+        self.recorded_track.rename(name)
         self.provider.notify_track_modified()
 
     def _on_waypoint_added(self) -> None:
@@ -471,6 +482,17 @@ class TrackRecorderDialog:
             name='start track recording from dialog',
         )
 
+    def _simplify_track(self) -> None:
+        removed = simplify_track(self.recorded_track)
+        if not removed:
+            rosys.notify('Track is already as simple as possible')
+            return
+        self.provider.notify_track_modified()
+        self.recorded_track_ui.notify_waypoints_changed()
+        self._update_track_on_map()
+        self._update_status()
+        rosys.notify(f'Removed {removed} waypoint{"s" if removed != 1 else ""}', 'positive')
+
     async def _delete_track(self) -> None:
         active = self.controller.active_track
         if active is not None and active.id == self.recorded_track.id:
@@ -3,12 +3,21 @@ from .recorded_track import GnssRequirement, RecordedTrack, RecordedTrackProvide
 from .recorded_track_navigation import RecordedTrackNavigation
 from .straight_line_navigation import StraightLineNavigation
 from .track_recording_controller import TrackRecordingController
-from .utils import generate_three_point_turn, is_reference_valid, skip_completed_segments, sub_spline
+from .track_simplification import OnlineTrackSimplifier, simplify_track
+from .utils import (
+    generate_three_point_turn,
+    geo_to_local,
+    is_reference_valid,
+    local_to_geo,
+    skip_completed_segments,
+    sub_spline,
+)
 from .waypoint_navigation import WaypointNavigation
 
 __all__ = [
     'DriveSegment',
     'GnssRequirement',
+    'OnlineTrackSimplifier',
     'RecordedTrack',
     'RecordedTrackNavigation',
     'RecordedTrackProvider',
@@ -17,7 +26,10 @@ __all__ = [
     'TrackRecordingController',
     'WaypointNavigation',
     'generate_three_point_turn',
+    'geo_to_local',
     'is_reference_valid',
+    'local_to_geo',
+    'simplify_track',
     'skip_completed_segments',
     'sub_spline'
 ]
@@ -1,15 +1,22 @@
+import json
 import logging
+import threading
+from collections.abc import Iterable
 from dataclasses import dataclass
 from datetime import datetime
 from enum import StrEnum
+from pathlib import Path
 from typing import Any, Self
 from uuid import uuid4
 
+import numpy as np
 import rosys
-from nicegui import Event
-from rosys.geometry import GeoPose
+from nicegui import Event, run
+from rosys.geometry import GeoPose, GeoReference
 from rosys.hardware.gnss import GpsQuality
 
+from .utils import geo_to_local
+
 
 class GnssRequirement(StrEnum):
     """Minimum GPS quality required when recording waypoints."""
@@ -66,20 +73,46 @@ class RecordedTrack:
         self.name = name if name is not None else datetime.now().strftime('%Y-%m-%d_%H-%M-%S.%f')
         self.gnss_requirement: GnssRequirement = GnssRequirement.RTK
         self._waypoints: list[RecordedWaypoint] = []
+        self.revision: int = 0
+        """Modification counter, incremented whenever the waypoints change (used to invalidate derived caches)."""
+        self._local_coordinates_key: tuple | None = None
+        self._local_coordinates: np.ndarray = np.empty((0, 3))
+        self._changes: list[dict[str, Any]] = []
 
     def meets_gnss_requirement(self, gps_quality: GpsQuality | None) -> bool:
         """Check whether the given GPS quality meets this track's minimum requirement."""
         return self.gnss_requirement.is_met_by(gps_quality)
 
+    def rename(self, name: str) -> None:
+        """Change the name of the track."""
+        self.name = name
+        self._changes.append({'op': 'rename', 'name': name})
+
+    def set_gnss_requirement(self, gnss_requirement: GnssRequirement) -> None:
+        """Change the minimum GPS quality required when recording waypoints."""
+        self.gnss_requirement = gnss_requirement
+        self._changes.append({'op': 'gnss_requirement', 'value': str(gnss_requirement)})
+
     def add_waypoint(self, waypoint: GeoPose, approach_reverse: bool = False) -> None:
         """Add a waypoint to the end of the list."""
         self._waypoints.append(RecordedWaypoint(pose=waypoint, approach_reverse=approach_reverse))
+        self._waypoints_changed({'op': 'add', 'waypoint': self._waypoints[-1].to_dict()})
 
     def remove_waypoint(self, index: int) -> None:
         """Remove a waypoint at the specified index."""
         if not self._is_valid_index(index):
             raise IndexError(f'Waypoint index {index} is out of bounds (track has {len(self._waypoints)} waypoints)')
         self._waypoints.pop(index)
+        self._waypoints_changed({'op': 'remove', 'indices': [index]})
+
+    def remove_waypoints(self, indices: Iterable[int]) -> None:
+        """Remove the waypoints at the specified indices in a single operation."""
+        index_set = set(indices)
+        invalid = sorted(index for index in index_set if not self._is_valid_index(index))
+        if invalid:
+            raise IndexError(f'Waypoint indices {invalid} are out of bounds (track has {len(self._waypoints)} waypoints)')
+        self._waypoints = [wp for i, wp in enumerate(self._waypoints) if i not in index_set]
+        self._waypoints_changed({'op': 'remove', 'indices': sorted(index_set)})
 
     def move_waypoint(self, from_index: int, to_index: int) -> None:
         """Move a waypoint from one position to another."""
@@ -89,6 +122,7 @@ class RecordedTrack:
             raise IndexError(f'to_index {to_index} is out of bounds (track has {len(self._waypoints)} waypoints)')
         waypoint = self._waypoints.pop(from_index)
         self._waypoints.insert(to_index, waypoint)
+        self._waypoints_changed({'op': 'move', 'from': from_index, 'to': to_index})
 
     def _is_valid_index(self, index: int) -> bool:
         return 0 <= index < len(self._waypoints)
@@ -102,18 +136,58 @@ class RecordedTrack:
     def set_waypoint_approach_reverse(self, index: int, approach_reverse: bool) -> None:
         """Set whether to approach the waypoint at the given index in reverse."""
         self.get_waypoint(index).approach_reverse = approach_reverse
+        self._waypoints_changed({'op': 'set', 'index': index, 'field': 'approach_reverse', 'value': approach_reverse})
 
     def set_waypoint_use_implement(self, index: int, use_implement: bool) -> None:
         """Set whether to allow implement usage on the segment leading to this waypoint."""
         self.get_waypoint(index).use_implement = use_implement
+        self._waypoints_changed({'op': 'set', 'index': index, 'field': 'use_implement', 'value': use_implement})
 
     def set_waypoint_stop_at_waypoint(self, index: int, stop_at_waypoint: bool) -> None:
         """Set whether to stop at this waypoint."""
         self.get_waypoint(index).stop_at_waypoint = stop_at_waypoint
+        self._waypoints_changed({'op': 'set', 'index': index, 'field': 'stop_at_waypoint', 'value': stop_at_waypoint})
 
     def clear(self) -> None:
         """Remove all waypoints."""
         self._waypoints.clear()
+        self._waypoints_changed({'op': 'clear'})
+
+    def _waypoints_changed(self, change: dict[str, Any]) -> None:
+        self.revision += 1
+        self._changes.append(change)
+
+    def pop_changes(self) -> list[dict[str, Any]]:
+        """Return and forget the changes made through the modifying methods since the last call.
+
+        Each change is a JSON-serializable dictionary that can be replayed with ``apply_change``.
+        """
+        changes, self._changes = self._changes, []
+        return changes
+
+    def apply_change(self, change: dict[str, Any]) -> None:
+        """Replay a change that has been returned by ``pop_changes`` (e.g. from a journal)."""
+        match change['op']:
+            case 'rename':
+                self.name = change['name']
+                return
+            case 'gnss_requirement':
+                self.gnss_requirement = GnssRequirement(change['value'])
+                return
+            case 'add':
+                self._waypoints.append(RecordedWaypoint.from_dict(change['waypoint']))
+            case 'remove':
+                indices = set(change['indices'])
+                self._waypoints = [wp for i, wp in enumerate(self._waypoints) if i not in indices]
+            case 'move':
+                self._waypoints.insert(change['to'], self._waypoints.pop(change['from']))
+            case 'set' if change['field'] in {'approach_reverse', 'use_implement', 'stop_at_waypoint'}:
+                setattr(self._waypoints[change['index']], change['field'], change['value'])
+            case 'clear':
+                self._waypoints.clear()
+            case _:
+                raise ValueError(f'Unknown track change: {change}')
+        self.revision += 1
 
     @property
     def first_waypoint(self) -> RecordedWaypoint | None:
@@ -130,6 +204,21 @@ class RecordedTrack:
         """Get the waypoints."""
         return self._waypoints
 
+    @property
+    def local_coordinates(self) -> np.ndarray:
+        """Local x, y and yaw of all waypoints as read-only ``(n, 3)`` array in the current geo reference.
+
+        The array is converted in a single vectorized pass and cached until the waypoints or the geo reference change.
+        """
+        assert GeoReference.current is not None
+        key = (self.revision, len(self._waypoints), GeoReference.current.tuple)
+        if key != self._local_coordinates_key:
+            geo = np.array([wp.pose.tuple for wp in self._waypoints], dtype=float).reshape(-1, 3)
+            self._local_coordinates = np.column_stack(geo_to_local(geo[:, 0], geo[:, 1], geo[:, 2]))
+            self._local_coordinates.flags.writeable = False
+            self._local_coordinates_key = key
+        return self._local_coordinates
+
     def to_dict(self) -> dict[str, Any]:
         return {
             'id': self.id,
@@ -148,28 +237,53 @@ class RecordedTrack:
 
 
 class RecordedTrackProvider(rosys.persistence.Persistable):
-    """A provider of recorded waypoints."""
+    """A provider of recorded waypoints.
+
+    When persistent, track changes are appended to a journal next to the backup file instead of rewriting all tracks.
+    The journal is compacted into the backup whenever a full backup is written
+    (e.g. after ``JOURNAL_COMPACTION_SIZE`` entries) and replayed on restore.
+    """
+
+    JOURNAL_COMPACTION_SIZE = 1000
 
     def __init__(self) -> None:
         super().__init__()
         self.log = logging.getLogger('feldfreund_devkit.recorded_track_provider')
         self.recorded_tracks: list[RecordedTrack] = []
         self.selected_track: RecordedTrack | None = None
+        self._journal_seq = 0
+        self._journal_size = 0
+        self._journal_lock = threading.Lock()
 
         """The recorded tracks have changed."""
         self.RECORDED_TRACKS_CHANGED: Event = Event()
         """ The selected track has changed. """
         self.RECORDED_TRACK_SELECTED: Event = Event()
 
+    @property
+    def journal_path(self) -> Path | None:
+        """The path of the journal file (``None`` if not persistent)."""
+        return self._filepath.with_suffix('.journal') if self._filepath is not None else None
+
     def select_track(self, track_id: str) -> None:
         """Select a track by ID."""
         self.selected_track = self.get_recorded_track(track_id)
         self.RECORDED_TRACK_SELECTED.emit()
-        self.request_backup()
+        self._append_to_journal([{'op': 'select', 'track': track_id}])
 
     def notify_track_modified(self) -> None:
-        """Persist changes to an existing track (e.g. waypoint added/removed/moved, name changed)."""
-        self.request_backup()
+        """Persist changes to an existing track (e.g. waypoint added/removed/moved, name changed).
+
+        Changes made through the modifying methods of ``RecordedTrack`` are journaled,
+        other modifications (e.g. assigning attributes directly) fall back to a full backup.
+        """
+        if not self._journal_changes(self.recorded_tracks):
+            self.request_backup()
+
+    def notify_waypoint_added(self, track: RecordedTrack) -> None:
+        """Persist a waypoint that has just been appended to the given track (e.g. while recording)."""
+        if not self._journal_changes([track]):
+            self.request_backup()
 
     def remove_recorded_track(self, track_id: str) -> None:
         """Remove a recorded track from the list."""
@@ -182,7 +296,7 @@ class RecordedTrackProvider(rosys.persistence.Persistable):
             self.selected_track = None
             self.RECORDED_TRACK_SELECTED.emit()
         self.RECORDED_TRACKS_CHANGED.emit()
-        self.request_backup()
+        self._append_to_journal([{'op': 'remove_track', 'track': track_id}])
 
     def get_recorded_track(self, track_id: str) -> RecordedTrack | None:
         """Get the recorded track by ID."""
@@ -196,11 +310,17 @@ class RecordedTrackProvider(rosys.persistence.Persistable):
         """Get the track names by their IDs."""
         return {track.id: track.name for track in self.recorded_tracks}
 
-    def add_recorded_track(self, track: RecordedTrack) -> None:
-        """Add a recorded track to the list."""
+    def add_recorded_track(self, track: RecordedTrack, *, emit: bool = True) -> None:
+        """Add a recorded track to the list.
+
+        :param track: the track to add
+        :param emit: whether to emit ``RECORDED_TRACKS_CHANGED``
+        """
         self.recorded_tracks.append(track)
-        self.RECORDED_TRACKS_CHANGED.emit()
-        self.request_backup()
+        track.pop_changes()
+        if emit:
+            self.RECORDED_TRACKS_CHANGED.emit()
+        self._append_to_journal([{'op': 'add_track', 'data': track.to_dict()}])
 
     def backup_to_dict(self) -> dict[str, Any]:
         """Backup the recorded tracks to a dictionary."""
@@ -210,6 +330,7 @@ class RecordedTrackProvider(rosys.persistence.Persistable):
                 for track in self.recorded_tracks
             ],
             'selected_track': self.selected_track.id if self.selected_track else None,
+            'journal_seq': self._journal_seq,
         }
 
     def restore_from_dict(self, data: dict[str, Any]) -> None:
@@ -218,6 +339,124 @@ class RecordedTrackProvider(rosys.persistence.Persistable):
         for track_data in data.get('recorded_tracks', []):
             track = RecordedTrack.from_dict(track_data)
             self.recorded_tracks.append(track)
+        self._journal_seq = data.get('journal_seq', 0)
         selected_track_id = data.get('selected_track', None)
         if selected_track_id is not None:
-            self.select_track(selected_track_id)
+            self.selected_track = self.get_recorded_track(selected_track_id)
+            self.RECORDED_TRACK_SELECTED.emit()
+
+    async def backup(self) -> None:
+        # NOTE: the snapshot is taken on the main thread so that it is consistent with the journal sequence number
+        data = self._take_snapshot()
+        await run.io_bound(self._write_snapshot, data)
+
+    def sync_backup(self) -> None:
+        self._write_snapshot(self._take_snapshot())
+
+    def sync_restore(self) -> None:
+        super().sync_restore()
+        self._replay_journal()
+
+    def _take_snapshot(self) -> dict[str, Any]:
+        for track in self.recorded_tracks:
+            track.pop_changes()
+        self._needs_backup = False
+        self._journal_size = 0
+        return self.backup_to_dict()
+
+    def _write_snapshot(self, data: dict[str, Any]) -> None:
+        if self._disabled:
+            raise RuntimeError('Backup failed: Persistence is disabled.')
+        if self._filepath is None:
+            raise RuntimeError('Backup failed: This object is not persistent. Call persistent() first.')
+        temporary_path = self._filepath.with_suffix('.tmp')
+        temporary_path.write_text(json.dumps(data))
+        temporary_path.replace(self._filepath)
+        self._compact_journal(data['journal_seq'])
+
+    def _journal_changes(self, tracks: Iterable[RecordedTrack]) -> bool:
+        entries = [{'op': 'change', 'track': track.id, 'change': change}
+                   for track in tracks for change in track.pop_changes()]
+        if not entries:
+            return False
+        self._append_to_journal(entries)
+        return True
+
+    def _append_to_journal(self, entries: list[dict[str, Any]]) -> None:
+        if self.journal_path is None:
+            self.request_backup()
+            return
+        lines = []
+        for entry in entries:
+            self._journal_seq += 1
+            lines.append(json.dumps({'seq': self._journal_seq, **entry}) + '\n')
+        with self._journal_lock, self.journal_path.open('a') as f:
+            f.writelines(lines)
+        self._journal_size += len(entries)
+        if self._journal_size >= self.JOURNAL_COMPACTION_SIZE:
+            self.request_backup()
+
+    def _compact_journal(self, seq: int) -> None:
+        """Drop all journal entries up to the given sequence number, which are contained in the backup."""
+        assert self.journal_path is not None
+        with self._journal_lock:
+            if not self.journal_path.exists():
+                return
+            entries = [entry for entry_seq, entry in self._read_journal() if entry_seq > seq]
+            if not entries:
+                self.journal_path.unlink()
+                return
+            temporary_path = self.journal_path.with_suffix('.journal.tmp')
+            temporary_path.write_text(''.join(json.dumps(entry) + '\n' for entry in entries))
+            temporary_path.replace(self.journal_path)
+
+    def _read_journal(self) -> list[tuple[int, dict[str, Any]]]:
+        assert self.journal_path is not None
+        entries = []
+        for line in self.journal_path.read_text().splitlines():
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:
+                # NOTE: the last line might be incomplete if the robot lost power while writing
+                self.log.warning('Skipping corrupt journal entry: %s', line)
+                continue
+            entries.append((entry['seq'], entry))
+        return entries
+
+    def _replay_journal(self) -> None:
+        if self.journal_path is None or not self.journal_path.exists():
+            return
+        replayed = 0
+        for seq, entry in self._read_journal():
+            if seq <= self._journal_seq:
+                continue
+            self._journal_seq = seq
+            try:
+                self._apply_journal_entry(entry)
+            except (IndexError, KeyError, ValueError):
+                self.log.exception('Failed to replay journal entry %s', entry)
+            replayed += 1
+        for track in self.recorded_tracks:
+            track.pop_changes()
+        self._journal_size = replayed
+        if replayed:
+            self.log.info('Replayed %d journal entries', replayed)
+            self.request_backup()
+
+    def _apply_journal_entry(self, entry: dict[str, Any]) -> None:
+        match entry['op']:
+            case 'add_track':
+                track = RecordedTrack.from_dict(entry['data'])
+                self.recorded_tracks = [t for t in self.recorded_tracks if t.id != track.id] + [track]
+            case 'remove_track':
+                self.recorded_tracks = [t for t in self.recorded_tracks if t.id != entry['track']]
+                if self.selected_track is not None and self.selected_track.id == entry['track']:
+                    self.selected_track = None
+            case 'select':
+                self.selected_track = self.get_recorded_track(entry['track'])
+            case 'change':
+                changed_track = self.get_recorded_track(entry['track'])
+                if changed_track is not None:
+                    changed_track.apply_change(entry['change'])
+            case _:
+                raise ValueError(f'Unknown journal entry: {entry}')
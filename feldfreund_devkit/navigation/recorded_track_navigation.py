@@ -9,11 +9,11 @@ import numpy as np
 import rosys
 from nicegui import ui
 from rosys.automation import Automator
-from rosys.geometry import Pose, Spline
+from rosys.geometry import GeoReference, Pose, Spline
 from rosys.hardware import Gnss
 
 from .drive_segment import DriveSegment
-from .recorded_track import GnssRequirement, RecordedTrack, RecordedTrackProvider
+from .recorded_track import GnssRequirement, RecordedTrack, RecordedTrackProvider, RecordedWaypoint
 from .track_recording_controller import TrackRecordingController
 from .utils import skip_completed_segments
 from .waypoint_navigation import WaypointNavigation
@@ -21,6 +21,8 @@ from .waypoint_navigation import WaypointNavigation
 if TYPE_CHECKING:
     from ..interface.components.track_recorder_dialog import TrackRecorderDialog
 
+WaypointKey = tuple[float, float, float, bool, bool, bool]
+
 
 class RecordedTrackNavigation(WaypointNavigation):
     """Drives along a previously recorded track of waypoints."""
@@ -50,6 +52,13 @@ class RecordedTrackNavigation(WaypointNavigation):
         self._settings_content_row: ui.column | None = None
         self._dialog_host: ui.element | None = None
         self._current_recorder: TrackRecorderDialog | None = None
+        # Generated segments are cached per track revision; single segments are memoized by the
+        # waypoints they connect, so editing one waypoint only rebuilds its adjacent segments.
+        # Waypoints are converted to local coordinates in bulk via RecordedTrack.local_coordinates.
+        self._path_cache_key: tuple | None = None
+        self._path_cache: list[DriveSegment] = []
+        self._segment_cache_scope: tuple | None = None
+        self._segment_cache: dict[tuple, DriveSegment] = {}
 
         self.recorded_track_provider.RECORDED_TRACK_SELECTED.subscribe(self._settings_content.refresh)
         self.recorded_track_provider.RECORDED_TRACKS_CHANGED.subscribe(self._settings_content.refresh)
@@ -75,43 +84,94 @@ class RecordedTrackNavigation(WaypointNavigation):
         recorded_track = self.recorded_track_provider.selected_track
         if recorded_track is None:
             raise ValueError('No track selected')
+        path_segments = skip_completed_segments(self.pose_provider.pose, self._track_segments(recorded_track),
+                                                max_distance=self.RESUME_MAX_OFFSET, max_angle=self.RESUME_MAX_HEADING)
+        if not path_segments:
+            rosys.notify(
+                f'Align the robot with the track (within {self.RESUME_MAX_OFFSET:.1f} m and '
+                f'{np.rad2deg(self.RESUME_MAX_HEADING):.0f}°)',
+                'negative', log_level=logging.ERROR)
+        return path_segments
+
+    def _track_segments(self, recorded_track: RecordedTrack) -> list[DriveSegment]:
+        """Return all segments of the track in driving direction, reusing cached segments where possible.
+
+        The returned list is shared with the cache and must not be modified.
+        """
+        reference = GeoReference.current.tuple if GeoReference.current is not None else None
+        key = (recorded_track.id, recorded_track.revision, self.reverse, reference)
+        if key == self._path_cache_key:
+            return self._path_cache
+        scope = (recorded_track.id, reference)
+        if scope != self._segment_cache_scope:
+            self._segment_cache_scope = scope
+            self._segment_cache = {}
         waypoints = recorded_track.waypoints
+        local_coordinates = recorded_track.local_coordinates if len(waypoints) > 1 else None
+        keys = [self._waypoint_key(wp) for wp in waypoints]
+        segment_cache: dict[tuple, DriveSegment] = {}
         path_segments: list[DriveSegment] = []
         for i in range(1, len(waypoints)):
-            start_pose = waypoints[i - 1].pose.to_local()
-            end_pose = waypoints[i].pose.to_local()
-            backward = waypoints[i].approach_reverse
-            spline = Spline.from_poses(start_pose, end_pose, backward=backward)
             is_last_segment = i == len(waypoints) - 1
-            path_segments.append(DriveSegment(
-                spline=spline,
-                backward=backward,
-                use_implement=waypoints[i].use_implement,
-                stop_at_end=waypoints[i].stop_at_waypoint or is_last_segment,
-            ))
+            segment_key: tuple = (keys[i - 1][:3], keys[i], is_last_segment)
+            segment = self._segment_cache.get(segment_key)
+            if segment is None:
+                assert local_coordinates is not None
+                segment = self._forward_segment(self._local_pose(local_coordinates, i - 1),
+                                                self._local_pose(local_coordinates, i),
+                                                waypoints[i], is_last_segment=is_last_segment)
+            segment_cache[segment_key] = segment
+            path_segments.append(segment)
         if self.reverse:
-            forward_segments = list(path_segments)
+            forward_segments = path_segments
             path_segments = []
             for j in range(len(forward_segments) - 1, -1, -1):
-                seg = forward_segments[j]
-                yaw_offset = 0.0 if seg.backward else math.pi
                 is_last_reversed = j == 0
-                path_segments.append(DriveSegment.from_poses(
-                    Pose(x=seg.end.x, y=seg.end.y, yaw=seg.end.yaw + yaw_offset),
-                    Pose(x=seg.start.x, y=seg.start.y, yaw=seg.start.yaw + yaw_offset),
-                    backward=seg.backward,
-                    use_implement=seg.use_implement,
-                    stop_at_end=seg.stop_at_end or is_last_reversed,
-                ))
-        path_segments = skip_completed_segments(self.pose_provider.pose, path_segments,
-                                                max_distance=self.RESUME_MAX_OFFSET, max_angle=self.RESUME_MAX_HEADING)
-        if not path_segments:
-            rosys.notify(
-                f'Align the robot with the track (within {self.RESUME_MAX_OFFSET:.1f} m and '
-                f'{np.rad2deg(self.RESUME_MAX_HEADING):.0f}°)',
-                'negative', log_level=logging.ERROR)
+                segment_key = ('reversed', keys[j][:3], keys[j + 1], j == len(forward_segments) - 1, is_last_reversed)
+                segment = self._segment_cache.get(segment_key)
+                if segment is None:
+                    segment = self._reversed_segment(forward_segments[j], is_last_reversed=is_last_reversed)
+                segment_cache[segment_key] = segment
+                path_segments.append(segment)
+        # NOTE: keep segments of the other direction so toggling "reverse" does not rebuild everything
+        for segment_key, segment in self._segment_cache.items():
+            if (segment_key[0] == 'reversed') != self.reverse:
+                segment_cache.setdefault(segment_key, segment)
+        self._segment_cache = segment_cache
+        self._path_cache_key = key
+        self._path_cache = path_segments
         return path_segments
 
+    @staticmethod
+    def _forward_segment(start_pose: Pose, end_pose: Pose, end: RecordedWaypoint, *, is_last_segment: bool) -> DriveSegment:
+        backward = end.approach_reverse
+        return DriveSegment(
+            spline=Spline.from_poses(start_pose, end_pose, backward=backward),
+            backward=backward,
+            use_implement=end.use_implement,
+            stop_at_end=end.stop_at_waypoint or is_last_segment,
+        )
+
+    @staticmethod
+    def _reversed_segment(segment: DriveSegment, *, is_last_reversed: bool) -> DriveSegment:
+        yaw_offset = 0.0 if segment.backward else math.pi
+        return DriveSegment.from_poses(
+            Pose(x=segment.end.x, y=segment.end.y, yaw=segment.end.yaw + yaw_offset),
+            Pose(x=segment.start.x, y=segment.start.y, yaw=segment.start.yaw + yaw_offset),
+            backward=segment.backward,
+            use_implement=segment.use_implement,
+            stop_at_end=segment.stop_at_end or is_last_reversed,
+        )
+
+    @staticmethod
+    def _local_pose(local_coordinates: np.ndarray, index: int) -> Pose:
+        x, y, yaw = local_coordinates[index].tolist()
+        return Pose(x=x, y=y, yaw=yaw)
+
+    @staticmethod
+    def _waypoint_key(waypoint: RecordedWaypoint) -> WaypointKey:
+        return (*waypoint.pose.tuple, waypoint.approach_reverse, waypoint.use_implement, waypoint.stop_at_waypoint)
+
     async def approach_start(self) -> None:
         """Approaches the start of the track directly.
 
@@ -1,16 +1,19 @@
 from __future__ import annotations
 
 import logging
+import math
 from typing import Protocol, runtime_checkable
 
 import rosys
 from nicegui import Event
 from rosys.automation import AppButton
 from rosys.driving.driver import PoseProvider
-from rosys.geometry import GeoPose
+from rosys.geometry import GeoPose, Pose
 from rosys.hardware import Gnss
+from rosys.helpers import angle
 
 from .recorded_track import RecordedTrack, RecordedTrackProvider
+from .track_simplification import OnlineTrackSimplifier
 
 log = logging.getLogger('feldfreund_devkit.track_recording_controller')
 
@@ -24,6 +27,13 @@ class AppButtonControls(Protocol):
     async def remove_button(self, key: str) -> None: ...
 
 
+@runtime_checkable
+class PoseUpdates(Protocol):
+    """Pose providers that emit every new pose (like the odometer and the robot locator)."""
+
+    POSE_UPDATED: Event[Pose]
+
+
 class TrackRecordingController:
     """Server-side recording mode that survives client disconnects.
 
@@ -33,19 +43,33 @@ class TrackRecordingController:
     The app button bar (``app_controls``) is bound late: it is created by the
     application after this controller and only on real hardware, so it stays
     ``None`` until assigned and the button registration is skipped while absent.
+
+    With a ``simplifier`` each new waypoint may replace the previous one if it lies on the same spline,
+    so densely recorded rows end up as few long segments.
+
+    In automatic mode the controller listens to the pose updates of the pose provider and adds a waypoint whenever
+    the robot has moved ``auto_distance`` meters or turned ``auto_heading`` radians since the last one.
+    Automatic waypoints always pass through an online simplifier, so long straight rows stay at a few waypoints.
     """
 
     APP_BUTTON_KEY = 'record_waypoint'
 
     def __init__(self, recorded_track_provider: RecordedTrackProvider, *,
-                 pose_provider: PoseProvider, gnss: Gnss | None = None) -> None:
+                 pose_provider: PoseProvider, gnss: Gnss | None = None,
+                 simplifier: OnlineTrackSimplifier | None = None,
+                 auto_distance: float = 0.5, auto_heading: float = math.radians(10)) -> None:
         self.recorded_track_provider = recorded_track_provider
         self.pose_provider = pose_provider
         self.gnss = gnss
+        self.simplifier = simplifier
+        self.auto_distance = auto_distance
+        self.auto_heading = auto_heading
         self.app_controls: AppButtonControls | None = None
         self._active_track: RecordedTrack | None = None
         self._track_was_new: bool = False
         self._started_at: float | None = None
+        self._auto_simplifier: OnlineTrackSimplifier | None = None
+        self._last_auto_pose: Pose | None = None
 
         self.RECORDING_STARTED: Event = Event()
         self.RECORDING_STOPPED: Event = Event()
@@ -59,6 +83,10 @@ class TrackRecordingController:
     def is_recording(self) -> bool:
         return self._active_track is not None
 
+    @property
+    def is_automatic(self) -> bool:
+        return self._auto_simplifier is not None
+
     @property
     def started_at(self) -> float | None:
         return self._started_at
@@ -67,7 +95,7 @@ class TrackRecordingController:
     def elapsed_seconds(self) -> float:
         return 0.0 if self._started_at is None else max(0.0, rosys.time() - self._started_at)
 
-    async def start_recording(self, track: RecordedTrack) -> bool:
+    async def start_recording(self, track: RecordedTrack, *, automatic: bool = False) -> bool:
         """Start a recording session. Returns False if a session is already active.
 
         Persists the track immediately (so it survives a server crash) without
@@ -78,15 +106,14 @@ class TrackRecordingController:
             rosys.notify('A recording is already in progress', 'warning')
             return False
         provider = self.recorded_track_provider
-        if track not in provider.recorded_tracks:
-            provider.recorded_tracks.append(track)
-            self._track_was_new = True
-        else:
-            self._track_was_new = False
-        provider.request_backup()
+        self._track_was_new = track not in provider.recorded_tracks
+        if self._track_was_new:
+            provider.add_recorded_track(track, emit=False)
         self._active_track = track
         self._started_at = rosys.time()
         await self._register_app_button()
+        if automatic:
+            self.set_automatic(True)
         self.RECORDING_STARTED.emit()
         log.info('Recording started for track %s (%s)', track.name, track.id)
         return True
@@ -97,6 +124,7 @@ class TrackRecordingController:
             return
         track = self._active_track
         was_new = self._track_was_new
+        self.set_automatic(False)
         self._active_track = None
         self._track_was_new = False
         self._started_at = None
@@ -123,11 +151,52 @@ class TrackRecordingController:
         if not self._meets_gnss_requirement(self._active_track):
             rosys.notify('Waypoint not added: GNSS quality insufficient', 'warning')
             return
-        geo_pose = GeoPose.from_pose(self.pose_provider.pose)
-        self._active_track.add_waypoint(geo_pose)
-        self.recorded_track_provider.notify_track_modified()
+        pose = self.pose_provider.pose
+        self._add_waypoint(self._active_track, pose, self.simplifier)
+        log.info('Waypoint %d added at %s', len(self._active_track.waypoints), pose)
+
+    def set_automatic(self, enabled: bool) -> None:
+        """Enable or disable adding waypoints automatically while the robot moves.
+
+        Has no effect if not recording or if the pose provider does not emit pose updates.
+        """
+        if enabled == self.is_automatic:
+            return
+        if not isinstance(self.pose_provider, PoseUpdates):
+            log.warning('Automatic recording not available: pose provider does not emit pose updates')
+            return
+        if enabled:
+            if self._active_track is None:
+                return
+            self._auto_simplifier = self.simplifier or OnlineTrackSimplifier()
+            self._last_auto_pose = None
+            self.pose_provider.POSE_UPDATED.subscribe(self._handle_pose_update)
+        else:
+            self.pose_provider.POSE_UPDATED.unsubscribe(self._handle_pose_update)
+            self._auto_simplifier = None
+        log.info('Automatic recording %s', 'enabled' if enabled else 'disabled')
+
+    def _handle_pose_update(self, pose: Pose) -> None:
+        if self._active_track is None or self._auto_simplifier is None:
+            return
+        last = self._last_auto_pose
+        if last is not None and last.distance(pose) < self.auto_distance and \
+                abs(angle(last.yaw, pose.yaw)) < self.auto_heading:
+            return
+        if not self._meets_gnss_requirement(self._active_track):
+            return
+        # NOTE: pose providers emit their own pose object which keeps changing, so we need a copy
+        self._last_auto_pose = Pose(x=pose.x, y=pose.y, yaw=pose.yaw)
+        self._add_waypoint(self._active_track, pose, self._auto_simplifier)
+
+    def _add_waypoint(self, track: RecordedTrack, pose: Pose, simplifier: OnlineTrackSimplifier | None) -> None:
+        geo_pose = GeoPose.from_pose(pose)
+        if simplifier is not None:
+            simplifier.add_waypoint(track, pose, geo_pose=geo_pose)
+        else:
+            track.add_waypoint(geo_pose)
+        self.recorded_track_provider.notify_waypoint_added(track)
         self.WAYPOINT_ADDED.emit()
-        log.info('Waypoint %d added at %s', len(self._active_track.waypoints), geo_pose)
 
     def _meets_gnss_requirement(self, track: RecordedTrack) -> bool:
         if self.gnss is None:
@@ -0,0 +1,155 @@
+from itertools import pairwise
+
+import numpy as np
+from rosys.geometry import GeoPose, Pose, Spline
+
+from .recorded_track import RecordedTrack, RecordedWaypoint
+
+DEFAULT_TOLERANCE = 0.05
+"""Default maximum lateral deviation (in meters) of a merged spline from the recorded waypoints."""
+
+
+def simplify_track(track: RecordedTrack, *, tolerance: float = DEFAULT_TOLERANCE) -> int:
+    """Remove waypoints that can be merged into longer splines without leaving the lateral tolerance.
+
+    Waypoints with ``stop_at_waypoint`` and waypoints where ``approach_reverse`` or ``use_implement`` change are kept,
+    so the simplified track drives and works exactly like the recorded one.
+
+    :param track: the track to simplify in place
+    :param tolerance: maximum lateral deviation in meters of a merged spline from the removed waypoints
+    :return: the number of removed waypoints
+    """
+    waypoints = track.waypoints
+    if len(waypoints) < 3:
+        return 0
+    keep = simplify_waypoints(track.local_coordinates, waypoints, tolerance=tolerance)
+    removed = [i for i in range(len(waypoints)) if i not in keep]
+    if removed:
+        track.remove_waypoints(removed)
+    return len(removed)
+
+
+def simplify_waypoints(local_coordinates: np.ndarray,
+                       waypoints: list[RecordedWaypoint], *,
+                       tolerance: float = DEFAULT_TOLERANCE) -> set[int]:
+    """Douglas-Peucker simplification of recorded waypoints that measures the deviation from the actual splines.
+
+    :param local_coordinates: ``(n, 3)`` array of local x, y and yaw of the waypoints
+    :param waypoints: the waypoints with their drive settings flags
+    :param tolerance: maximum lateral deviation in meters
+    :return: the indices of the waypoints to keep
+    """
+    n = len(waypoints)
+    keep = {0, n - 1}
+    for i in range(1, n - 1):
+        if not _can_be_merged(waypoints[i], waypoints[i + 1]):
+            keep.add(i)
+    for start, end in pairwise(sorted(keep)):
+        stack = [(start, end)]
+        while stack:
+            a, b = stack.pop()
+            if b - a < 2:
+                continue
+            deviations = spline_deviations(local_coordinates[a], local_coordinates[b], local_coordinates[a + 1:b, :2],
+                                           backward=waypoints[b].approach_reverse)
+            worst = int(np.argmax(deviations))
+            if deviations[worst] <= tolerance:
+                continue
+            split = a + 1 + worst
+            keep.add(split)
+            stack.extend([(a, split), (split, b)])
+    return keep
+
+
+def spline_deviations(start: np.ndarray, end: np.ndarray, points: np.ndarray, *,
+                      backward: bool = False, resolution: float = 0.02) -> np.ndarray:
+    """Distances of the given points to the spline between two local poses.
+
+    The spline is sampled with the given resolution and the distances are measured to the resulting polyline.
+
+    :param start: local x, y and yaw of the spline start
+    :param end: local x, y and yaw of the spline end
+    :param points: ``(k, 2)`` array of local x and y
+    :param backward: whether the spline is driven backward
+    :param resolution: sampling distance along the spline in meters
+    :return: array of ``k`` distances
+    """
+    if len(points) == 0:
+        return np.empty(0)
+    spline = Spline.from_poses(Pose(x=start[0], y=start[1], yaw=start[2]),
+                               Pose(x=end[0], y=end[1], yaw=end[2]), backward=backward)
+    chord = float(np.hypot(end[0] - start[0], end[1] - start[1]))
+    t = np.linspace(0.0, 1.0, max(int(np.ceil(2 * chord / resolution)), 8) + 1)
+    samples = np.column_stack((spline.x(t), spline.y(t)))
+    segment_starts = samples[:-1]
+    segment_vectors = samples[1:] - samples[:-1]
+    lengths_squared = np.maximum(np.sum(segment_vectors**2, axis=1), 1e-12)
+    offsets = points[:, None, :] - segment_starts[None, :, :]
+    s = np.clip(np.sum(offsets * segment_vectors[None, :, :], axis=2) / lengths_squared[None, :], 0.0, 1.0)
+    closest = segment_starts[None, :, :] + s[:, :, None] * segment_vectors[None, :, :]
+    return np.min(np.linalg.norm(points[:, None, :] - closest, axis=2), axis=1)
+
+
+def _can_be_merged(waypoint: RecordedWaypoint, next_waypoint: RecordedWaypoint) -> bool:
+    """Whether the segments ending at ``waypoint`` and at ``next_waypoint`` can be driven as one spline."""
+    return not waypoint.stop_at_waypoint and \
+        waypoint.approach_reverse == next_waypoint.approach_reverse and \
+        waypoint.use_implement == next_waypoint.use_implement
+
+
+class OnlineTrackSimplifier:
+    """Simplifies a track while it is being recorded.
+
+    Each new waypoint replaces the previous one as long as the spline from the last kept waypoint still covers all
+    waypoints recorded since then within the tolerance. The number of buffered waypoints is bounded by ``max_window``,
+    so memory stays constant however long a straight row is.
+    """
+
+    def __init__(self, *, tolerance: float = DEFAULT_TOLERANCE, max_window: int = 100) -> None:
+        self.tolerance = tolerance
+        self.max_window = max_window
+        self._track: RecordedTrack | None = None
+        self._revision: int | None = None
+        self._anchor: np.ndarray | None = None
+        self._last: np.ndarray | None = None
+        self._window: list[np.ndarray] = []
+
+    def add_waypoint(self, track: RecordedTrack, pose: Pose, *, geo_pose: GeoPose | None = None) -> bool:
+        """Append a waypoint at the given local pose and drop the previous one if it is no longer needed.
+
+        :param track: the track being recorded
+        :param pose: the local pose of the new waypoint
+        :param geo_pose: the geo pose of the new waypoint (default: converted from ``pose``)
+        :return: whether the previous waypoint has been replaced
+        """
+        if track is not self._track or track.revision != self._revision:
+            self._restart(track)
+        track.add_waypoint(geo_pose or GeoPose.from_pose(pose))
+        new = np.array([pose.x, pose.y, pose.yaw])
+        replaced = False
+        if self._anchor is None:
+            self._anchor = new
+        elif self._last is None:
+            self._last = new
+        else:
+            waypoints = track.waypoints
+            candidates = np.array([*self._window, self._last])
+            if len(candidates) <= self.max_window and _can_be_merged(waypoints[-2], waypoints[-1]) and \
+                    np.all(spline_deviations(self._anchor, new, candidates[:, :2],
+                                             backward=waypoints[-1].approach_reverse) <= self.tolerance):
+                track.remove_waypoint(len(waypoints) - 2)
+                self._window.append(self._last)
+                replaced = True
+            else:
+                self._anchor = self._last
+                self._window = []
+            self._last = new
+        self._revision = track.revision
+        return replaced
+
+    def _restart(self, track: RecordedTrack) -> None:
+        self._track = track
+        self._window = []
+        self._last = None
+        last_waypoint = track.last_waypoint
+        self._anchor = track.local_coordinates[-1].copy() if last_waypoint is not None else None
@@ -2,6 +2,7 @@ import logging
 
 import numpy as np
 from rosys.geometry import GeoReference, Point, Pose, Spline
+from rosys.geometry.geo import RADIUS
 from rosys.hardware import Gnss
 from rosys.helpers import angle
 
@@ -23,6 +24,77 @@ def is_reference_valid(gnss: Gnss | None, *, max_distance: float = 5000.0) -> bo
     return gnss.last_measurement.point.distance(GeoReference.current.origin) <= max_distance
 
 
+def geo_to_local(lat: np.ndarray, lon: np.ndarray, heading: np.ndarray, *,
+                 reference: GeoReference | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert geo poses (radians) to local poses in one vectorized pass.
+
+    Equivalent to calling ``GeoPose.to_local()`` for every element, but without creating intermediate objects.
+
+    :param lat: latitudes in radians
+    :param lon: longitudes in radians
+    :param heading: headings in radians
+    :param reference: the geo reference to use (default: ``GeoReference.current``)
+    :return: arrays of local x, y and yaw
+    """
+    reference = reference or GeoReference.current
+    assert reference is not None
+    lat, lon, heading = np.asarray(lat, dtype=float), np.asarray(lon, dtype=float), np.asarray(heading, dtype=float)
+    x, y = _geo_points_to_local(reference, lat, lon)
+    # NOTE: like GeoPose.to_local, the yaw is derived from a second point 1 m ahead along the heading
+    angular_distance = 1 / RADIUS
+    ahead_lat = np.arcsin(np.sin(lat) * np.cos(angular_distance) +
+                          np.cos(lat) * np.sin(angular_distance) * np.cos(heading))
+    ahead_lon = lon + np.arctan2(np.sin(heading) * np.sin(angular_distance) * np.cos(lat),
+                                 np.cos(angular_distance) - np.sin(lat) * np.sin(ahead_lat))
+    ahead_x, ahead_y = _geo_points_to_local(reference, ahead_lat, ahead_lon)
+    return x, y, np.arctan2(ahead_y - y, ahead_x - x)
+
+
+def local_to_geo(x: np.ndarray, y: np.ndarray, yaw: np.ndarray, *,
+                 reference: GeoReference | None = None) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Convert local poses to geo poses (radians) in one vectorized pass.
+
+    Equivalent to calling ``GeoPose.from_pose()`` for every element, but without creating intermediate objects.
+
+    :param x: local x coordinates
+    :param y: local y coordinates
+    :param yaw: local yaw angles
+    :param reference: the geo reference to use (default: ``GeoReference.current``)
+    :return: arrays of latitude, longitude and heading in radians
+    """
+    reference = reference or GeoReference.current
+    assert reference is not None
+    x, y, yaw = np.asarray(x, dtype=float), np.asarray(y, dtype=float), np.asarray(yaw, dtype=float)
+    lat, lon = _local_points_to_geo(reference, x, y)
+    ahead_lat, ahead_lon = _local_points_to_geo(reference, x + np.cos(yaw), y + np.sin(yaw))
+    heading = np.arctan2(np.sin(ahead_lon - lon) * np.cos(ahead_lat),
+                         np.cos(lat) * np.sin(ahead_lat) - np.sin(lat) * np.cos(ahead_lat) * np.cos(ahead_lon - lon))
+    return lat, lon, heading
+
+
+def _geo_points_to_local(reference: GeoReference, lat: np.ndarray, lon: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    origin_lat, origin_lon = reference.origin.lat, reference.origin.lon
+    d_lat = lat - origin_lat
+    d_lon = lon - origin_lon
+    a = np.sin(d_lat / 2)**2 + np.cos(origin_lat) * np.cos(lat) * np.sin(d_lon / 2)**2
+    distance = RADIUS * 2 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+    direction = np.arctan2(np.sin(d_lon) * np.cos(lat),
+                           np.cos(origin_lat) * np.sin(lat) - np.sin(origin_lat) * np.cos(lat) * np.cos(d_lon))
+    angle = reference.direction - direction
+    return distance * np.cos(angle), distance * np.sin(angle)
+
+
+def _local_points_to_geo(reference: GeoReference, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    origin_lat, origin_lon = reference.origin.lat, reference.origin.lon
+    angular_distance = np.hypot(x, y) / RADIUS
+    direction = reference.direction - np.arctan2(y, x)
+    lat = np.arcsin(np.sin(origin_lat) * np.cos(angular_distance) +
+                    np.cos(origin_lat) * np.sin(angular_distance) * np.cos(direction))
+    lon = origin_lon + np.arctan2(np.sin(direction) * np.sin(angular_distance) * np.cos(origin_lat),
+                                  np.cos(angular_distance) - np.sin(origin_lat) * np.sin(lat))
+    return lat, lon
+
+
 def sub_spline(spline: Spline, t_min: float, t_max: float) -> Spline:
     """Creates a new spline from a sub-segment of the given spline"""
     # TODO: move to rosys.geometry.spline
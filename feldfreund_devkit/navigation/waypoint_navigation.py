@@ -1,6 +1,9 @@
 import gc
 import logging
 from abc import abstractmethod
+from collections import deque
+from collections.abc import Iterable, Iterator
+from itertools import islice
 from typing import Any
 
 import rosys
@@ -19,6 +22,8 @@ class WaypointNavigation(rosys.persistence.Persistable):
     """Base class for all waypoint based navigation types."""
 
     LINEAR_SPEED_LIMIT: float = 0.13
+    PATH_LOOKAHEAD: int = 100
+    """Maximum number of upcoming segments pulled from the generated path at a time (at least 2)."""
 
     def __init__(self, *, implement: Implement, driver: Driver, pose_provider: PoseProvider, name: str = 'Waypoint Navigation') -> None:
         super().__init__()
@@ -29,11 +34,12 @@ class WaypointNavigation(rosys.persistence.Persistable):
         self.name = name
         self._default_min_speed = driver.parameters.throttle_at_end_min_speed
         self._default_max_speed = driver.parameters.linear_speed_limit
-        self._upcoming_path: list[DriveSegment] = []
+        self._upcoming_path: deque[DriveSegment] = deque()
+        self._path_source: Iterator[DriveSegment] | None = None
         self.linear_speed_limit = self.LINEAR_SPEED_LIMIT
 
         self.PATH_GENERATED = Event[list[DriveSegment]]()
-        """a new path has been generated(argument: ``list[DriveSegment]``)"""
+        """a new path or look-ahead window has been generated (argument: ``list[DriveSegment]``)"""
 
         self.SEGMENT_STARTED = Event[DriveSegment]()
         """a waypoint has been reached"""
@@ -46,8 +52,8 @@ class WaypointNavigation(rosys.persistence.Persistable):
 
     @property
     def path(self) -> list[DriveSegment]:
-        """Returns the whole planned path."""
-        return self._upcoming_path
+        """Returns the upcoming segments of the look-ahead window (the whole path if it fits)."""
+        return list(self._upcoming_path)
 
     @property
     def current_segment(self) -> DriveSegment | None:
@@ -66,17 +72,40 @@ class WaypointNavigation(rosys.persistence.Persistable):
         """Prepares the navigation for the start of the automation
 
         Returns true if all preparations were successful, otherwise false."""
-        self._upcoming_path = self.generate_path()
+        self._upcoming_path.clear()
+        self._path_source = iter(self.generate_path())
+        self._extend_lookahead()
         if not self._upcoming_path:
             self.log.error('Path generation failed')
             return False
-        self.PATH_GENERATED.emit(self._upcoming_path)
+        self.PATH_GENERATED.emit(self.path)
         return True
 
     @abstractmethod
-    def generate_path(self) -> list[DriveSegment]:
+    def generate_path(self) -> Iterable[DriveSegment]:
+        """Generate the segments to drive along.
+
+        May return a lazy iterator: segments are only pulled into the look-ahead window when needed,
+        so the start latency does not depend on the length of the path.
+        """
         raise NotImplementedError('Subclasses must implement this method')
 
+    def _extend_lookahead(self) -> bool:
+        """Pull segments from the path source until the look-ahead window is full.
+
+        Returns true if new segments were added.
+        """
+        if self._path_source is None:
+            return False
+        missing = max(self.PATH_LOOKAHEAD, 2) - len(self._upcoming_path)
+        if missing <= 0:
+            return False
+        count = len(self._upcoming_path)
+        self._upcoming_path.extend(islice(self._path_source, missing))
+        if len(self._upcoming_path) - count < missing:
+            self._path_source = None
+        return len(self._upcoming_path) > count
+
     @track
     async def start(self) -> None:
         try:
@@ -134,6 +163,7 @@ class WaypointNavigation(rosys.persistence.Persistable):
         """Executed after the navigation is done"""
         await self.driver.wheels.stop()
         await self.implement.deactivate()
+        self._path_source = None
         gc.collect()  # NOTE: auto garbage collection is deactivated to avoid hiccups from Global Interpreter Lock (GIL) so we collect here to reduce memory pressure
         self.log.debug('Navigation finished')
 
@@ -146,7 +176,10 @@ class WaypointNavigation(rosys.persistence.Persistable):
         stop_at_end = segment.stop_at_end or len(self._upcoming_path) == 1
         with self.driver.parameters.set(linear_speed_limit=linear_speed_limit, can_drive_backwards=segment.backward):
             await self.driver.drive_spline(segment.spline, flip_hook=segment.backward, throttle_at_end=stop_at_end, stop_at_end=stop_at_end)
-        self._upcoming_path.pop(0)
+        self._upcoming_path.popleft()
+        # NOTE: refill in batches so PATH_GENERATED is emitted once per window instead of once per segment
+        if len(self._upcoming_path) <= max(self.PATH_LOOKAHEAD // 2, 1) and self._extend_lookahead():
+            self.PATH_GENERATED.emit(self.path)
         self.SEGMENT_COMPLETED.emit(segment)
         if self.has_waypoints:
             assert self.current_segment is not None
@@ -156,6 +156,30 @@ async def test_skip_first_segment(devkit_system):
     assert devkit_system.current_navigation.current_segment.end.yaw_deg == pytest.approx(pose3.yaw_deg, abs=0.1)
 
 
+async def test_lazy_path_is_pulled_in_lookahead_windows(devkit_system):
+    assert isinstance(devkit_system.current_navigation, StraightLineNavigation)
+    navigation = devkit_system.current_navigation
+    navigation.PATH_LOOKAHEAD = 4
+    generated: list[int] = []
+    windows: list[list[DriveSegment]] = []
+
+    def generate_path():
+        for i in range(10):
+            generated.append(i)
+            yield DriveSegment.from_poses(Pose(x=0.2 * i), Pose(x=0.2 * (i + 1)), stop_at_end=False)
+    navigation.generate_path = generate_path  # type: ignore[assignment]
+    navigation.PATH_GENERATED.subscribe(windows.append)
+    devkit_system.automator.start()
+    await forward(until=lambda: devkit_system.automator.is_running)
+    assert len(navigation.path) == 4
+    assert len(generated) == 4
+    await forward(until=lambda: devkit_system.automator.is_stopped)
+    assert len(generated) == 10
+    assert len(windows) > 1
+    assert all(len(window) <= 4 for window in windows)
+    assert devkit_system.robot_locator.pose.point.x == pytest.approx(2.0, abs=0.01)
+
+
 @pytest.mark.parametrize(('robot_x', 'robot_yaw_deg', 'expected_count', 'expected_start_x'), [
     (0.0, 0, 3, 0.0),  # at start of first segment, facing forward
     (0.5, 0, 3, 0.0),  # on first segment, facing forward
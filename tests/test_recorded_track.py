@@ -1,5 +1,6 @@
 import math
 
+import numpy as np
 import pytest
 from conftest import GEO_REFERENCE
 from rosys.geometry import GeoPose, GeoReference, Pose
@@ -10,10 +11,15 @@ from rosys.testing import forward
 from feldfreund_devkit.navigation import (
     DriveSegment,
     GnssRequirement,
+    OnlineTrackSimplifier,
     RecordedTrack,
     RecordedTrackNavigation,
+    RecordedTrackProvider,
     RecordedWaypoint,
     generate_three_point_turn,
+    geo_to_local,
+    local_to_geo,
+    simplify_track,
 )
 
 _LAT_DEG = math.degrees(GEO_REFERENCE.origin.lat)
@@ -122,6 +128,61 @@ def test_meets_gnss_requirement():
     assert track.meets_gnss_requirement(GpsQuality.RTK_FIXED) is True
 
 
+def test_journal_replays_changes_after_backup(tmp_path):
+    provider = RecordedTrackProvider().persistent(key='journal-test', path=tmp_path,
+                                                  backup_check_interval=None, disable_in_tests=False)
+    track = _make_track([{}, {}, {}])
+    provider.add_recorded_track(track)
+    provider.sync_backup()
+    assert provider.journal_path is not None
+    assert not provider.journal_path.exists()
+
+    track.add_waypoint(GeoPose.from_degrees(_LAT_DEG + 0.0001, _LON_DEG, 0.0))
+    track.set_waypoint_use_implement(3, True)
+    track.move_waypoint(0, 2)
+    track.remove_waypoint(1)
+    track.rename('renamed')
+    provider.notify_track_modified()
+    provider.select_track(track.id)
+    assert len(provider.journal_path.read_text().splitlines()) == 6
+
+    restored = RecordedTrackProvider()
+    restored._filepath = provider._filepath  # pylint: disable=protected-access
+    restored.sync_restore()
+    assert [t.to_dict() for t in restored.recorded_tracks] == [track.to_dict()]
+    assert restored.selected_track is restored.recorded_tracks[0]
+
+    provider.sync_backup()
+    assert not provider.journal_path.exists()
+
+
+def test_vectorized_geo_conversion_matches_scalar_conversion():
+    poses = [Pose(x=x, y=y, yaw=yaw) for x, y, yaw in [(0, 0, 0), (12.5, -3.0, 1.0), (-250.0, 80.0, -2.5), (1e4, 1e4, math.pi)]]
+    lat, lon, heading = local_to_geo(np.array([p.x for p in poses]), np.array([p.y for p in poses]),
+                                     np.array([p.yaw for p in poses]), reference=GEO_REFERENCE)
+    for i, pose in enumerate(poses):
+        expected = GEO_REFERENCE.pose_to_geo(pose)
+        assert (lat[i], lon[i]) == pytest.approx((expected.lat, expected.lon), abs=1e-12)
+        assert angle(heading[i], expected.heading) == pytest.approx(0, abs=1e-9)
+    x, y, yaw = geo_to_local(lat, lon, heading, reference=GEO_REFERENCE)
+    for i, pose in enumerate(poses):
+        assert (x[i], y[i]) == pytest.approx((pose.x, pose.y), abs=1e-6)
+        assert angle(yaw[i], pose.yaw) == pytest.approx(0, abs=1e-6)
+
+
+def test_local_coordinates_are_cached_until_modified(three_point_turn_track: RecordedTrack):
+    coordinates = three_point_turn_track.local_coordinates
+    assert coordinates.shape == (6, 3)
+    assert not coordinates.flags.writeable
+    for row, wp in zip(coordinates, three_point_turn_track.waypoints, strict=True):
+        local = wp.pose.to_local()
+        assert row[:2] == pytest.approx((local.x, local.y), abs=1e-6)
+        assert angle(row[2], local.yaw) == pytest.approx(0, abs=1e-6)
+    assert three_point_turn_track.local_coordinates is coordinates
+    three_point_turn_track.remove_waypoint(0)
+    assert three_point_turn_track.local_coordinates.shape == (5, 3)
+
+
 def test_reversed_three_point_turn_headings(three_point_turn_track: RecordedTrack):
     """All headings are rotated 180° when reversing, regardless of approach_reverse."""
     forward_yaws = [wp.pose.to_local().yaw for wp in three_point_turn_track.waypoints]
@@ -132,6 +193,66 @@ def test_reversed_three_point_turn_headings(three_point_turn_track: RecordedTrac
         assert reversed_yaw == pytest.approx(forward_yaws[original_idx] + math.pi, abs=1e-6)
 
 
+def test_generated_segments_are_cached(devkit_system, three_point_turn_track: RecordedTrack):
+    navigation = devkit_system.recorded_track_navigation
+    segments = navigation._track_segments(three_point_turn_track)
+    assert navigation._track_segments(three_point_turn_track) is segments
+
+    three_point_turn_track.set_waypoint_use_implement(2, True)
+    updated = navigation._track_segments(three_point_turn_track)
+    assert updated is not segments
+    assert [a is b for a, b in zip(segments, updated, strict=True)] == [True, False, True, True, True]
+    assert updated[1].use_implement is True
+
+
+def test_moving_a_waypoint_rebuilds_only_adjacent_segments(devkit_system, three_point_turn_track: RecordedTrack):
+    navigation = devkit_system.recorded_track_navigation
+    segments = navigation._track_segments(three_point_turn_track)
+    three_point_turn_track.waypoints[3].pose = GeoPose.from_pose(Pose(x=0.0, y=1.2, yaw=math.pi))
+    three_point_turn_track.revision += 1
+    updated = navigation._track_segments(three_point_turn_track)
+    assert [a is b for a, b in zip(segments, updated, strict=True)] == [True, True, False, False, True]
+    assert updated[2].end.y == pytest.approx(1.2, abs=1e-6)
+
+
+def test_reversed_segments_are_cached_separately(devkit_system, three_point_turn_track: RecordedTrack):
+    navigation = devkit_system.recorded_track_navigation
+    forward_segments = navigation._track_segments(three_point_turn_track)
+    navigation.reverse = True
+    reversed_segments = navigation._track_segments(three_point_turn_track)
+    assert reversed_segments[0].start.x == pytest.approx(forward_segments[-1].end.x)
+    assert reversed_segments[-1].stop_at_end is True
+    navigation.reverse = False
+    assert navigation._track_segments(three_point_turn_track) == forward_segments
+
+
+def test_simplify_straight_row_keeps_endpoints_and_stops(devkit_system):
+    track = RecordedTrack(name='row')
+    track._waypoints = [RecordedWaypoint(pose=GeoPose.from_pose(Pose(x=0.5 * i, y=0.0, yaw=0.0)), stop_at_waypoint=i == 10)
+                        for i in range(21)]
+    assert simplify_track(track) == 18
+    assert [round(wp.pose.to_local().x, 3) for wp in track.waypoints] == [0.0, 5.0, 10.0]
+    assert track.waypoints[1].stop_at_waypoint is True
+
+
+def test_simplify_keeps_curves_and_flag_changes(three_point_turn_track: RecordedTrack):
+    assert simplify_track(three_point_turn_track) == 0
+    assert len(three_point_turn_track.waypoints) == 6
+
+
+def test_online_simplifier_replaces_waypoints_on_the_same_spline(devkit_system):
+    track = RecordedTrack(name='online')
+    simplifier = OnlineTrackSimplifier()
+    for i in range(20):
+        simplifier.add_waypoint(track, Pose(x=0.5 * i, y=0.0, yaw=0.0))
+    assert len(track.waypoints) == 2
+    for i in range(1, 10):
+        yaw = i * math.pi / 18
+        simplifier.add_waypoint(track, Pose(x=9.5 + 2 * math.sin(yaw), y=2 - 2 * math.cos(yaw), yaw=yaw))
+    assert 3 < len(track.waypoints) < 11
+    assert track.waypoints[-1].pose.to_local().y == pytest.approx(2.0, abs=1e-6)
+
+
 # ---------------------------------------------------------------------------
 # Integration tests — forward and reversed three-point-turn track with working segments before and after
 # ---------------------------------------------------------------------------
@@ -261,3 +382,19 @@ async def test_recorded_track_navigation(devkit_system, reverse: bool):
     assert devkit_system.robot_locator.pose.point.x == pytest.approx(end_pose.x, abs=0.1)
     assert devkit_system.robot_locator.pose.point.y == pytest.approx(end_pose.y, abs=0.1)
     assert angle(end_pose.yaw, devkit_system.robot_locator.pose.yaw) == pytest.approx(0, abs=0.1)
+
+
+async def test_automatic_recording_adds_decimated_waypoints(devkit_system):
+    controller = devkit_system.track_recording_controller
+    track = RecordedTrack(name='auto')
+    track.gnss_requirement = GnssRequirement.NONE
+    assert await controller.start_recording(track, automatic=True)
+    assert controller.is_automatic
+    devkit_system.current_navigation.length = 5.0
+    devkit_system.automator.start()
+    await forward(until=lambda: devkit_system.automator.is_running)
+    await forward(until=lambda: devkit_system.automator.is_stopped)
+    await controller.stop_recording()
+    assert not controller.is_automatic
+    assert len(track.waypoints) == 2
+    assert track.waypoints[-1].pose.to_local().x == pytest.approx(5.0, abs=0.5)